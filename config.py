@@ -12,6 +12,7 @@ class Config:
     HOST = '0.0.0.0'  # Listen on all interfaces (USB and WiFi)
     PORT = 5000
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    MAX_CONTENT_LENGTH = 1024  # bytes; request bodies are small JSON objects
 
     # Camera defaults
     DEFAULT_EXPOSURE = 100  # ms
@@ -21,6 +22,10 @@ class Config:
     EXPOSURE_MIN = 10       
     EXPOSURE_MAX = 10000    
 
+    # Validation range for the LED level sent with a capture
+    LED_MIN = 0.0
+    LED_MAX = 1.0
+
     # Supported image formats
     SUPPORTED_FORMATS = ['tif']
 
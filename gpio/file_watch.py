@@ -0,0 +1,73 @@
+"""
+Block on file creation/removal with Linux inotify instead of polling.
+
+Used for the /tmp/capture_ready handshake between startup_flash.py and
+flask_server.py so neither side wakes the CPU every poll interval.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+
+IN_CLOEXEC = 0o2000000
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+# struct inotify_event header: wd, mask, cookie, len (name follows)
+_EVENT_HEADER = struct.Struct('iIII')
+
+_libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+
+def _check(ret: int) -> int:
+    if ret < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return ret
+
+
+def _events(fd: int):
+    """Yield (mask, name) for each event read from an inotify fd, name as bytes."""
+    while True:
+        buf = os.read(fd, 4096)
+        offset = 0
+        while offset < len(buf):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            # Kept as bytes: /tmp may hold names that aren't valid UTF-8
+            name = buf[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            yield mask, name
+
+
+def _wait(path: str, mask: int, exists: bool):
+    """Block until os.path.exists(path) == exists."""
+    directory, name = os.path.split(os.path.abspath(path))
+    name = os.fsencode(name)
+
+    fd = _check(_libc.inotify_init1(IN_CLOEXEC))
+    try:
+        _check(_libc.inotify_add_watch(fd, directory.encode(), mask))
+
+        # The change may have happened before the watch was armed
+        if os.path.exists(path) == exists:
+            return
+
+        for _, event_name in _events(fd):
+            if event_name == name:
+                return
+    finally:
+        os.close(fd)
+
+
+def wait_for_file(path: str):
+    """Block until path exists."""
+    _wait(path, IN_CREATE | IN_MOVED_TO, exists=True)
+
+
+def wait_for_removal(path: str):
+    """Block until path no longer exists."""
+    _wait(path, IN_DELETE | IN_MOVED_FROM, exists=False)
@@ -7,19 +7,17 @@ solid green itself.
 """
 
 import os
-from time import sleep
 
+from gpio.file_watch import wait_for_file
 from gpio.rgb_led import RGBLED
 
 READY_FILE = '/tmp/capture_ready'
-POLL_INTERVAL = 0.5
 
 led = RGBLED(r_pin=17, g_pin=27, b_pin=22)
 
 try:
     led.flash_green()
-    while not os.path.exists(READY_FILE):
-        sleep(POLL_INTERVAL)
+    wait_for_file(READY_FILE)
 finally:
     led.off()
     led.close()
@@ -46,6 +46,14 @@ sudo apt-get install -y libcurl4-openssl-dev libusb-1.0-0-dev
 # Install Python dependencies
 sudo apt-get install -y python3 python3-pip python3-venv
 
+# Install pigpio daemon (hardware-timed PWM for the status LED). Optional:
+# not packaged on every release, gpiozero falls back to its default pins
+if sudo apt-get install -y pigpio; then
+    sudo systemctl enable --now pigpiod || echo "  ⚠ Could not start pigpiod, using default pin factory"
+else
+    echo "  ⚠ pigpio unavailable, using default pin factory"
+fi
+
 echo "  ✓ System dependencies installed"
 echo ""
 
@@ -128,8 +136,8 @@ source "$VENV_DIR/bin/activate"
 # Upgrade pip
 pip install --upgrade pip -q
 
-# Install Flask (minimal dependencies only)
-pip install flask
+# Install Python dependencies (minimal set only)
+pip install -r "$PROJECT_DIR/requirements.txt"
 
 echo "  ✓ Python dependencies installed"
 deactivate
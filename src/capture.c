@@ -206,7 +206,7 @@ void callback(
             uint32_t frame_pixels = frame_dimensions->width * frame_dimensions->height;
             if (callback_data->length >= frame_pixels) {
                 pthread_mutex_lock(callback_data->mutex);
-                memcpy(callback_data->buffer, temp_frame_data, callback_data->length * sizeof(uint16_t));
+                memcpy(callback_data->buffer, temp_frame_data, frame_pixels * sizeof(uint16_t));
                 pthread_mutex_unlock(callback_data->mutex);
             } else {
                 LOG_ERROR("buffer too small: need %u pixels, have %u", frame_pixels, callback_data->length);
@@ -5,11 +5,7 @@ import ctypes
 
 import numpy as np
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the application (flask_server.py)
 logger = logging.getLogger(__name__)
 
 def _get_path():
@@ -21,45 +17,58 @@ def _get_path():
 
     return lib_path
 
-# Init libcapture library
-_lib_path = _get_path()
-logger.info(f"Loading C library from: {_lib_path}")
-
-_libcapture = ctypes.CDLL(_lib_path)
-
-# Define _libcapture function argtypes
-_libcapture.open_device.argtypes = [
-    ctypes.POINTER(ctypes.c_void_p)
-]
-
-_libcapture.close_device.argtypes = [
-    ctypes.c_void_p
-]
-
-_libcapture.get_frame_dims.argtypes = [
-    ctypes.c_void_p,
-    ctypes.POINTER(ctypes.c_uint16),
-    ctypes.POINTER(ctypes.c_uint16)
-]
-
-_libcapture.read_register.argtypes = [
-    ctypes.c_void_p,
-    ctypes.c_uint16,
-    ctypes.POINTER(ctypes.c_uint16)
-]
-
-_libcapture.write_register.argtypes = [
-    ctypes.c_void_p,
-    ctypes.c_uint16,
-    ctypes.c_uint16
-]
-
-_libcapture.capture_frame.argtypes = [
-    ctypes.c_void_p,
-    ctypes.c_uint16,                    # Exposure time (ms)
-    ctypes.POINTER(ctypes.c_uint16),    # Pointer to buffer
-    ctypes.c_uint32                     # Length
-]
+# libcapture handle, loaded on first Device() so importing this module does
+# not dlopen the C library (and libxdtusb) before a device is needed
+_libcapture = None
+
+def _load_library():
+    """Load libcapture.so and declare its function signatures once."""
+    global _libcapture
+
+    if _libcapture is not None:
+        return _libcapture
+
+    lib_path = _get_path()
+    logger.info(f"Loading C library from: {lib_path}")
+
+    lib = ctypes.CDLL(lib_path)
+
+    # Define lib function argtypes
+    lib.open_device.argtypes = [
+        ctypes.POINTER(ctypes.c_void_p)
+    ]
+
+    lib.close_device.argtypes = [
+        ctypes.c_void_p
+    ]
+
+    lib.get_frame_dims.argtypes = [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_uint16),
+        ctypes.POINTER(ctypes.c_uint16)
+    ]
+
+    lib.read_register.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint16,
+        ctypes.POINTER(ctypes.c_uint16)
+    ]
+
+    lib.write_register.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint16,
+        ctypes.c_uint16
+    ]
+
+    lib.capture_frame.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_uint16,                    # Exposure time (ms)
+        ctypes.POINTER(ctypes.c_uint16),    # Pointer to buffer
+        ctypes.c_uint32                     # Length
+    ]
+
+    _libcapture = lib
+    return _libcapture
 
 class DeviceError(Exception):
     """Represents an error in the capture device"""
@@ -69,10 +78,12 @@ class DroppedFrame(Exception):
 
 class Device:
     def __init__(self):
+        self._lib = _load_library()
+
         # Device pointer
         self._handle = ctypes.c_void_p()
 
-        err = _libcapture.open_device(ctypes.byref(self._handle))
+        err = self._lib.open_device(ctypes.byref(self._handle))
         self._check_error(err)
 
         self._disable_dds()
@@ -80,59 +91,60 @@ class Device:
         c_w = ctypes.c_uint16()
         c_h = ctypes.c_uint16()
 
-        err = _libcapture.get_frame_dims(self._handle, ctypes.byref(c_w), 
+        err = self._lib.get_frame_dims(self._handle, ctypes.byref(c_w), 
                                          ctypes.byref(c_h))
         self._check_error(err)
 
         self.width = c_w.value
         self.height = c_h.value
 
-        print(f"width: {self.width}, height: {self.height}")
+        logger.info(f"Frame dims: width: {self.width}, height: {self.height}")
+
+        # Frame buffer and its C pointer, allocated once and reused by every
+        # capture
+        self._frame_buffer = np.empty(self.width * self.height, dtype=np.uint16)
+        self._frame_ptr = self._frame_buffer.ctypes.data_as(
+            ctypes.POINTER(ctypes.c_uint16))
+        self._frame = self._frame_buffer.reshape(self.height, self.width)
 
     def _disable_dds(self):
-        err = _libcapture.write_register(self._handle, 425, 0)
+        err = self._lib.write_register(self._handle, 425, 0)
         self._check_error(err)
 
     def capture_frame(self, exposure_ms: int):
         """
-        Docstring for capture_frame
-        
-        :param self: Description
+        Capture a single frame.
+
+        :param exposure_ms: Exposure time in ms
+        :return: uint16 array of shape (height, width). This is the device's
+            own buffer, so it is overwritten by the next capture.
         """
-        logger.info(f"Capture_frame called: {exposure_ms}ms")
-        # Check that self.width and self.height are valid
-        
-        # Define buffer
-        frame_buffer = np.empty(
-            shape=(self.width * self.height, 1), dtype=np.uint16)
-        
-        logger.info('Buffer defined')
-        
-        # Get pointer to first element in buffer
-        frame_buffer_ptr = frame_buffer.ctypes.data_as(
-            ctypes.POINTER(ctypes.c_uint16))
-        
-        logger.info('Buffer pointer found')
-        
+        logger.info("Capture_frame called: %dms", exposure_ms)
+
         # Call capture_frame function
-        err = _libcapture.capture_frame(
+        err = self._lib.capture_frame(
             self._handle, 
             exposure_ms,
-            frame_buffer_ptr,
-            frame_buffer.size
+            self._frame_ptr,
+            self._frame_buffer.size
         )
         if err == 2: 
             # Frame dropped, try and capture again
             raise DroppedFrame('Frame dropped')
+        self._check_error(err)
 
         logger.info('Frame captured')
 
-        logger.debug(f'Captured image statistics: \n min: {np.min(frame_buffer)} \n max: {np.max(frame_buffer)}')
+        # min/max each scan the whole frame, so only compute them when
+        # debug logging is actually on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Captured image statistics: \n min: %d \n max: %d',
+                         np.min(self._frame), np.max(self._frame))
 
-        return frame_buffer
+        return self._frame
     
     def close_device(self):
-        _libcapture.close_device(self._handle)
+        self._lib.close_device(self._handle)
 
     def _check_error(self, err: int):
         if err != 0:
@@ -9,42 +9,58 @@ Optimized for Pi Zero 2W with minimal resource usage.
 import os
 import sys
 import logging
+import math
 import signal
 import subprocess
 import threading
 import time
-import gzip
+import zlib
 
 READY_FILE = '/tmp/capture_ready'
 
 from flask import Flask, request, jsonify, Response
+from waitress import serve
+from werkzeug.exceptions import HTTPException
 
+from gpio.file_watch import wait_for_removal
 from gpio.rgb_led import RGBLED
 from gpio.shutdown_button import ShutdownButton
 
-from src.capture_wrapper import Device, DeviceError, DroppedFrame
+from config import Config
+from src.capture_wrapper import Device, DroppedFrame
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=Config.LOG_LEVEL,
+    format=Config.LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
-# Flask app (single-threaded for Pi Zero resource constraints)
+# Flask app, served by waitress (two worker threads, device access serialised
+# by device_lock)
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 
-# Constants
-EXPOSURE_MIN = 10
-EXPOSURE_MAX = 10000
-DEFAULT_EXPOSURE = 100
+# Frame data is compressed and sent in slices of this size
+STREAM_CHUNK_BYTES = 64 * 1024
 
-# Global initialised flag
-initialised = False
+# Validation bounds, shared with the rest of the app via Config
+EXPOSURE_MIN = Config.EXPOSURE_MIN
+EXPOSURE_MAX = Config.EXPOSURE_MAX
+LED_MIN = Config.LED_MIN
+LED_MAX = Config.LED_MAX
 
 # Global device
 device = None
 
+# Serialises use of the device. Held by /capture until its response body,
+# which reads the device's reused frame buffer, has been sent.
+device_lock = threading.Lock()
+
+# How long a shutdown signal waits for an in-flight capture before exiting
+# without closing the device
+SHUTDOWN_LOCK_TIMEOUT = 5
+
 # Global LED (set in main, used in capture endpoint)
 led = None
 
@@ -54,6 +70,23 @@ shutdown_btn = None
 # Set to True when button hold triggers system shutdown
 shutdown_pending = False
 
+@app.errorhandler(HTTPException)
+def http_error(e):
+    """Return HTTP errors (404, 405, 413, ...) in the API's JSON error shape."""
+    return jsonify({
+        'status': 'error',
+        'message': e.description
+    }), e.code
+
+
+def _device_busy():
+    """409 response for a device request made while another holds the lock."""
+    return jsonify({
+        'status': 'error',
+        'message': 'Device busy'
+    }), 409
+
+
 @app.route('/init', methods=['POST'])
 def init():
     """
@@ -61,15 +94,19 @@ def init():
 
     Response:
         200: Init successful
+        409: Device busy with another request
     """
     global device
-    global initialised
 
-    if initialised is not None and device is not None:
-        device.close_device()
+    if not device_lock.acquire(blocking=False):
+        return _device_busy()
+    try:
+        if device is not None:
+            device.close_device()
 
-    device = Device()
-    initialised = True
+        device = Device()
+    finally:
+        device_lock.release()
 
     return jsonify({
         'status': 'success',
@@ -98,23 +135,29 @@ def capture():
             - X-Exposure-Ms: Exposure time in ms
             - X-LED: led value
             - Content-Type: application/octet-stream
+        409: Device busy with another request
     """
-    global device
-    global initialised
-
-    # Parse request
-    data = request.get_json()
-    if not data or 'exposure_ms' not in data:
+    # Parse request. The body is read once, so don't keep a cached copy of
+    # it on the request; malformed JSON falls through to the 400 below.
+    data = request.get_json(silent=True, cache=False)
+    if not isinstance(data, dict) or 'exposure_ms' not in data:
         return jsonify({
             'status': 'error',
             'message': 'Missing exposure_ms parameter'
         }), 400
 
+    if 'led' not in data:
+        return jsonify({
+            'status': 'error',
+            'message': 'Missing led parameter'
+        }), 400
+
     exposure_ms = data['exposure_ms']
     led_val = data['led']
 
-    # Validate exposure time
-    if not isinstance(exposure_ms, (int, float)):
+    # Validate exposure time. bool is an int subclass, and the JSON parser
+    # accepts NaN/Infinity, which int() below can't convert
+    if not _is_number(exposure_ms):
         return jsonify({
             'status': 'error',
             'message': 'exposure_ms must be a number'
@@ -127,54 +170,129 @@ def capture():
             'status': 'error',
             'message': f'exposure_ms must be between {EXPOSURE_MIN} and {EXPOSURE_MAX}'
         }), 400
-    
-    # Capture frame
-    logger.info(f"Capturing frame with exposure: {exposure_ms} ms")
-
-    if led is not None:
-        led.solid_blue()
 
-    try:
-        data = device.capture_frame(exposure_ms)
-        logger.info(f"capture_frame returned")
-    except DroppedFrame:
-        # Frame dropped, try capture once more
-        data = device.capture_frame(exposure_ms)
-        logger.info(f"capture_frame returned")
-    except Exception as e:
-        logger.error(f"Exception in capture_frame: {e}", exc_info=True)
+    # Validate LED level
+    if not _is_number(led_val):
         return jsonify({
             'status': 'error',
-            'message': f'Failed to capture frame: {str(e)}'
-        }), 500
-    finally:
-        if led is not None:
-            led.solid_green()
+            'message': 'led must be a number'
+        }), 400
 
-    # Copy frame data to Python bytes and compress
-    try:
-        frame_bytes = bytes(data)
-        compressed_bytes = gzip.compress(frame_bytes, compresslevel=1)
-    except Exception as e:
-        logger.error(f"Exception copying frame data: {e}", exc_info=True)
+    if not (LED_MIN <= led_val <= LED_MAX):
         return jsonify({
             'status': 'error',
-            'message': f'Failed to copy frame data: {str(e)}'
-        }), 500
-
-    logger.info(f"Frame captured: {len(data)} bytes")
+            'message': f'led must be between {LED_MIN} and {LED_MAX}'
+        }), 400
+    
+    # Capture frame
+    logger.info("Capturing frame with exposure: %d ms", exposure_ms)
+
+    # Released by _LockedStream.close() once the frame has been sent, or
+    # below if anything fails before the response is handed over. Never
+    # wait for it: a blocked request would tie up the other waitress
+    # thread and leave /status unanswered until the exposure finished.
+    if not device_lock.acquire(blocking=False):
+        return _device_busy()
+    streaming = False
+    try:
+        if led is not None:
+            led.solid_blue()
 
-    # Create response with binary data
-    response = Response(compressed_bytes, mimetype='application/octet-stream')
-    response.headers['X-Frame-Width'] = str(device.width)
-    response.headers['X-Frame-Height'] = str(device.height)
-    response.headers['X-Exposure-Ms'] = str(exposure_ms)
-    response.headers['X-LED'] = str(led_val)
-    response.headers['Content-Encoding'] = 'gzip'
+        try:
+            try:
+                data = device.capture_frame(exposure_ms)
+            except DroppedFrame:
+                # Frame dropped, try capture once more
+                data = device.capture_frame(exposure_ms)
+            logger.info("capture_frame returned")
+        except Exception as e:
+            logger.error("Exception in capture_frame: %s", e, exc_info=True)
+            return jsonify({
+                'status': 'error',
+                'message': f'Failed to capture frame: {str(e)}'
+            }), 500
+        finally:
+            if led is not None:
+                led.solid_green()
+
+        logger.info("Frame captured: %d bytes", data.nbytes)
+
+        # Stream the frame rather than holding full copies of it in memory.
+        # Gzip only when the client accepts it: zlib costs hundreds of ms of
+        # CPU per frame on the Pi, which clients on a fast link can opt out of.
+        # direct_passthrough hands the generator to the WSGI server as-is,
+        # without Werkzeug re-wrapping it.
+        use_gzip = request.accept_encodings['gzip'] > 0
+        stream = _gzip_stream(data) if use_gzip else _raw_stream(data)
+        response = Response(
+            _LockedStream(stream, device_lock),
+            mimetype='application/octet-stream',
+            direct_passthrough=True
+        )
+        response.headers['X-Frame-Width'] = str(device.width)
+        response.headers['X-Frame-Height'] = str(device.height)
+        response.headers['X-Exposure-Ms'] = str(exposure_ms)
+        response.headers['X-LED'] = str(led_val)
+        response.headers['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response.content_length = data.nbytes
+
+        streaming = True
+    finally:
+        if not streaming:
+            device_lock.release()
 
     return response
 
 
+def _is_number(value):
+    """True for a finite JSON number; False for bools, NaN and infinities."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, int)
+
+
+class _LockedStream:
+    """
+    Response body that releases lock when the WSGI server closes it, i.e.
+    after the last chunk is sent or the client disconnects.
+    """
+
+    def __init__(self, chunks, lock):
+        self._chunks = chunks
+        self._lock = lock
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self._chunks.close()
+        self._lock.release()
+
+
+def _gzip_stream(frame):
+    """Yield frame gzip-compressed, STREAM_CHUNK_BYTES of input at a time."""
+    view = memoryview(frame).cast('B')
+    # wbits=31 writes a gzip header/trailer; level 1 for speed on the Pi
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+    for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+        chunk = compressor.compress(view[offset:offset + STREAM_CHUNK_BYTES])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def _raw_stream(frame):
+    """Yield frame uncompressed, STREAM_CHUNK_BYTES at a time."""
+    view = memoryview(frame).cast('B')
+    for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+        yield bytes(view[offset:offset + STREAM_CHUNK_BYTES])
+
+
 @app.route('/shutdown', methods=['POST'])
 def shutdown():
     """
@@ -182,15 +300,20 @@ def shutdown():
 
     Response:
         200: Shutdown successful
+        409: Device busy with another request
     """
     global device
-    global initialised
 
     logger.info("Shutting down device...")
 
-    device.close_device()
-    device = None
-    initialised = False
+    if not device_lock.acquire(blocking=False):
+        return _device_busy()
+    try:
+        if device is not None:
+            device.close_device()
+            device = None
+    finally:
+        device_lock.release()
 
     return jsonify({
         'status': 'success',
@@ -225,9 +348,34 @@ def power_off():
     return jsonify({'status': 'success', 'message': 'Shutting down'}), 200
 
 
+def _use_pigpio_pins():
+    """
+    Use the pigpio pin factory when pigpiod is running, so PWMLED duty
+    cycles are generated by the daemon (DMA-timed) instead of a software
+    PWM thread in this process. Falls back to gpiozero's default factory
+    otherwise, e.g. when developing off the Pi.
+    """
+    try:
+        from gpiozero import Device as PinDevice
+        from gpiozero.pins.pigpio import PiGPIOFactory
+
+        PinDevice.pin_factory = PiGPIOFactory()
+    except (ImportError, OSError):
+        logger.info("pigpiod unavailable, using default pin factory")
+
+
 def signal_handler(sig, frame):
     """Handle shutdown signals gracefully."""
     logger.info(f"Received signal {sig}, shutting down...")
+    # Don't close the handle under a capture still using it
+    if device_lock.acquire(timeout=SHUTDOWN_LOCK_TIMEOUT):
+        try:
+            if device is not None:
+                device.close_device()
+        finally:
+            device_lock.release()
+    else:
+        logger.warning("Device busy, exiting without closing it")
     if led is not None:
         led.off()
         led.close()
@@ -250,6 +398,9 @@ def main():
     logger.info("Western Blot Capture API Server")
     logger.info("=" * 60)
 
+    # Must be chosen before any gpiozero device is created
+    _use_pigpio_pins()
+
     # Arm shutdown button — held for 3s triggers system shutdown
     try:
         shutdown_btn = ShutdownButton(pin=3, hold_time=3.0, on_held=_do_shutdown)
@@ -258,8 +409,8 @@ def main():
 
     try:
 
-        # Start Flask server (single-threaded for Pi Zero)
-        logger.info("Starting Flask server on 0.0.0.0:5000")
+        # Start WSGI server
+        logger.info(f"Starting waitress server on {Config.HOST}:{Config.PORT}")
         logger.info("Endpoints:")
         logger.info("  POST /capture  - Capture image")
         logger.info("  POST /shutdown - Shutdown device")
@@ -268,8 +419,7 @@ def main():
         # Signal startup_flash.py to stop and wait for it to delete the file,
         # confirming it has released the GPIO pins before we claim them
         open(READY_FILE, 'w').close()
-        while os.path.exists(READY_FILE):
-            time.sleep(1)
+        wait_for_removal(READY_FILE)
 
         # Initialise RGB LED now that pins are free
         try:
@@ -279,11 +429,18 @@ def main():
             logger.error(f"Failed to initialise RGB LED: {e}")
             led = None
 
-        app.run(
-            host='0.0.0.0',
-            port=5000,
-            debug=False,
-            threaded=False  # Single-threaded for Pi Zero resource constraints
+        # waitress keeps connections alive and buffers the response off the
+        # request thread, unlike the Werkzeug dev server. Two worker threads
+        # so /status is answered during a long exposure; device_lock keeps
+        # the device itself to one request at a time. Raise
+        # outbuf_overflow above a full frame (~3MB) so waitress keeps the
+        # response in RAM instead of spilling it to a temp file on the SD card.
+        serve(
+            app,
+            host=Config.HOST,
+            port=Config.PORT,
+            threads=2,
+            outbuf_overflow=8 * 1024 * 1024
         )
 
     except Exception as e:
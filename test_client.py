@@ -7,106 +7,88 @@ Tests basic functionality and demonstrates API usage.
 
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import numpy as np
 from pathlib import Path
-from PIL import Image
 
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+# Seconds to wait for the TCP connection; read timeouts are set per call.
+# With the one connect retry in main(), a Pi that is down fails in ~4.5s.
+CONNECT_TIMEOUT = 2.0
 
-def test_init(base_url):
-    """Test init endpoint."""
-    print("Testing /init endpoint...")
-    try:
-        response = requests.post(f"{base_url}/init", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ Device initialized: {data}")
-            return True
-        else:
-            print(f"  ✗ Initialization failed: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"    Error: {error.get('message', 'Unknown error')}")
-            except:
-                print(f"    {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ✗ Initialization error: {e}")
-        return False
 
+# --test name -> (method, path, read timeout in seconds)
+PROBES = {
+    'health': ('GET', '/health', 5),
+    'init': ('POST', '/init', 10),
+    'led_on': ('POST', '/led_on', 5),
+    'led_off': ('POST', '/led_off', 5),
+    'shutdown': ('POST', '/shutdown', 5),
+}
 
-def test_health(base_url):
-    """Test health endpoint."""
-    print("Testing /health endpoint...")
+
+def run_probe(session, base_url, name):
+    """Call one of the simple JSON endpoints in PROBES and report the result."""
+    method, path, read_timeout = PROBES[name]
+    print(f"Testing {path} endpoint...")
     try:
-        response = requests.get(f"{base_url}/health", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ Health check passed: {data}")
-            return True
-        elif response.status_code == 503:
-            data = response.json()
-            print(f"  ⚠ Device not ready: {data}")
-            return False
-        else:
-            print(f"  ✗ Health check failed: {response.status_code}")
-            print(f"    {response.text}")
-            return False
+        response = session.request(
+            method,
+            f"{base_url}{path}",
+            timeout=(CONNECT_TIMEOUT, read_timeout)
+        )
     except Exception as e:
-        print(f"  ✗ Health check error: {e}")
+        print(f"  ✗ {name} error: {e}")
+        return False
+
+    if response.status_code == 200:
+        print(f"  ✓ {name} passed: {_body_text(response)}")
+        return True
+    elif response.status_code == 503:
+        print(f"  ⚠ Device not ready: {_body_text(response)}")
+        return False
+    else:
+        print(f"  ✗ {name} failed: {response.status_code}")
+        print(f"    {_error_message(response)}")
         return False
 
 
-def test_led_on(base_url):
-    """Test LED on endpoint."""
-    print("Testing /led_on endpoint...")
+def _body_text(response):
+    """Response body as parsed JSON where possible, else raw text."""
     try:
-        response = requests.post(f"{base_url}/led_on", timeout=5)
-        if response.status_code == 200:
-            print(f"  ✓ LED turned on")
-            return True
-        else:
-            print(f"  ✗ LED on failed: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"    Error: {error.get('message', 'Unknown error')}")
-            except:
-                print(f"    {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ✗ LED on error: {e}")
-        return False
+        return response.json()
+    except ValueError:
+        return response.text
 
 
-def test_led_off(base_url):
-    """Test LED off endpoint."""
-    print("Testing /led_off endpoint...")
+def _error_message(response):
+    """The 'message' field of a JSON error body, else the raw text."""
     try:
-        response = requests.post(f"{base_url}/led_off", timeout=5)
-        if response.status_code == 200:
-            print(f"  ✓ LED turned off")
-            return True
-        else:
-            print(f"  ✗ LED off failed: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"    Error: {error.get('message', 'Unknown error')}")
-            except:
-                print(f"    {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ✗ LED off error: {e}")
-        return False
+        return f"Error: {response.json().get('message', 'Unknown error')}"
+    except ValueError:
+        return response.text
 
 
-def test_capture(base_url, exposure_ms, led_val, output_file=None):
+def test_capture(session, base_url, exposure_ms, led_val, output_file=None, compress=True):
     """Test capture endpoint."""
     print(f"Testing /capture endpoint (exposure: {exposure_ms}ms, led_val: {led_val})...")
+    # With identity the server streams the raw frame and the client skips
+    # gunzipping it; worth it when the link is faster than zlib on the Pi
+    headers = None if compress else {'Accept-Encoding': 'identity'}
     try:
-        response = requests.post(
+        response = session.post(
             f"{base_url}/capture",
             json={"exposure_ms": exposure_ms, "led": led_val},
-            timeout=exposure_ms/1000 + 30  # exposure + 30s buffer
+            headers=headers,
+            timeout=(CONNECT_TIMEOUT, _capture_read_timeout(exposure_ms)),
+            stream=True
         )
 
         if response.status_code == 200:
@@ -115,127 +97,151 @@ def test_capture(base_url, exposure_ms, led_val, output_file=None):
             height = int(response.headers.get('X-Frame-Height', 0))
             exposure = response.headers.get('X-Exposure-Ms')
 
-            print(f"  ✓ Capture successful:")
-            print(f"    Resolution: {width}x{height}")
-            print(f"    Exposure: {exposure}ms")
-            print(f"    Led value: {led_val}")
-            print(f"    Data size: {len(response.content)} bytes")
+            # Stream the body straight into a preallocated frame buffer
+            frame = np.empty(width * height, dtype=np.uint16)
+            received = _read_into(response, frame)
 
             # Verify data size (assuming uint16 pixels)
-            expected_size = width * height * 2
-            if len(response.content) == expected_size:
-                print(f"    Data size matches expected: {expected_size} bytes")
+            expected_size = frame.nbytes
+            size_ok = received == expected_size
+            if size_ok:
+                size_check = f"Data size matches expected: {expected_size} bytes"
             else:
-                print(f"    WARNING: Data size mismatch! Expected {expected_size}, got {len(response.content)}")
+                size_check = f"WARNING: Data size mismatch! Expected {expected_size}, got {received}"
+
+            # One write per report block rather than a syscall per line
+            sys.stdout.write(
+                f"  ✓ Capture successful:\n"
+                f"    Resolution: {width}x{height}\n"
+                f"    Exposure: {exposure}ms\n"
+                f"    Led value: {led_val}\n"
+                f"    Data size: {received} bytes\n"
+                f"    {size_check}\n"
+            )
+
+            # Part of the buffer is still uninitialised np.empty memory
+            if not size_ok:
+                return False
 
             # Save to file if requested
             if output_file:
                 output_path = Path(output_file)
-                output_path.write_bytes(response.content)
+                frame.tofile(output_path)
                 print(f"    Saved to: {output_file}")
 
-                # Show basic statistics if numpy available
+                # Writable, contiguous 2-D view of the streamed buffer; no copy
+                image = frame.reshape((height, width))
                 try:
-                    image = np.frombuffer(response.content, dtype=np.uint16)
-                    image = image.reshape((height, width))
-
-                    Image.fromarray(image).save('test.tiff')
-                    print(f"    Statistics:")
-                    print(f"      Min: {image.min()}")
-                    print(f"      Max: {image.max()}")
-                    print(f"      Mean: {image.mean():.1f}")
-                    print(f"      Std: {image.std():.1f}")
+                    _save_tiff('test.tiff', image)
                 except ImportError:
-                    print(f"    (Install numpy for image statistics)")
+                    print(f"    (Install tifffile or Pillow to save the TIFF preview)")
+
+                lo, hi, mean, std = _frame_stats(image)
+                sys.stdout.write(
+                    f"    Statistics:\n"
+                    f"      Min: {lo}\n"
+                    f"      Max: {hi}\n"
+                    f"      Mean: {mean:.1f}\n"
+                    f"      Std: {std:.1f}\n"
+                )
 
             return True
         else:
             print(f"  ✗ Capture failed: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"    Error: {error.get('message', 'Unknown error')}")
-            except:
-                print(f"    {response.text}")
+            print(f"    {_error_message(response)}")
             return False
 
     except requests.exceptions.Timeout:
-        print(f"  ✗ Capture timeout (waited {exposure_ms/1000 + 30}s)")
+        print(f"  ✗ Capture timeout (waited {_capture_read_timeout(exposure_ms):.1f}s)")
         return False
     except Exception as e:
         print(f"  ✗ Capture error: {e}")
         return False
 
 
-def test_shutdown(base_url):
-    """Test shutdown endpoint."""
-    print("Testing /shutdown endpoint...")
+def _capture_read_timeout(exposure_ms):
+    """
+    Read timeout for /capture: the server waits up to exposure +
+    max(1.5 * exposure, 1s) per attempt and retries a dropped frame once,
+    plus 10s for compression and transfer.
+    """
+    exposure_s = exposure_ms / 1000
+    return 2 * (exposure_s + max(1.5 * exposure_s, 1.0)) + 10
+
+
+def _frame_stats(image):
+    """Min, max, mean and std of a frame; all zero for an empty frame."""
+    if image.size == 0:
+        return 0, 0, 0.0, 0.0
+    return image.min(), image.max(), image.mean(), image.std()
+
+
+def _save_tiff(path, image):
+    """Write a uint16 frame as TIFF, using tifffile when it is installed."""
+    if tifffile is not None:
+        # Writes the array buffer as-is, no PIL mode conversion copy
+        tifffile.imwrite(path, image, photometric='minisblack')
+    else:
+        from PIL import Image
+        Image.fromarray(image).save(path)
+
+
+def _read_into(response, buf):
+    """
+    Stream a response body into buf (a numpy array) without building an
+    intermediate bytes object. Returns the number of body bytes received;
+    anything beyond the size of buf is counted but dropped.
+    """
+    view = memoryview(buf).cast('B')
+    offset = 0
+    for chunk in response.iter_content(chunk_size=1 << 20):
+        n = min(len(chunk), len(view) - offset)
+        if n > 0:
+            view[offset:offset + n] = chunk[:n]
+        offset += len(chunk)
+    return offset
+
+
+def _warm_up(session, base_url):
+    """Prime DNS and the keep-alive pool with a HEAD /status; errors are ignored."""
     try:
-        response = requests.post(f"{base_url}/shutdown", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"  ✓ Device shutdown: {data}")
-            return True
-        else:
-            print(f"  ✗ Shutdown failed: {response.status_code}")
-            try:
-                error = response.json()
-                print(f"    Error: {error.get('message', 'Unknown error')}")
-            except:
-                print(f"    {response.text}")
-            return False
-    except Exception as e:
-        print(f"  ✗ Shutdown error: {e}")
-        return False
+        session.head(f"{base_url}/status", timeout=(CONNECT_TIMEOUT, 2))
+    except requests.exceptions.RequestException:
+        pass
 
 
-def test_invalid_exposure(base_url):
+def test_invalid_exposure(session, base_url):
     """Test error handling with invalid exposure times."""
     print("Testing error handling...")
 
-    # Test too low
-    print("  Testing exposure too low (5ms)...")
-    try:
-        response = requests.post(
-            f"{base_url}/capture",
-            json={"exposure_ms": 5},
-            timeout=5
-        )
-        if response.status_code == 400:
-            print(f"    ✓ Correctly rejected with 400")
-        else:
-            print(f"    ✗ Expected 400, got {response.status_code}")
-    except Exception as e:
-        print(f"    ✗ Error: {e}")
+    cases = [
+        ("exposure too low (5ms)", {"exposure_ms": 5, "led": 0.01}),
+        ("exposure too high (20000ms)", {"exposure_ms": 20000, "led": 0.01}),
+        ("missing exposure_ms", {"led": 0.01}),
+    ]
 
-    # Test too high
-    print("  Testing exposure too high (20000ms)...")
-    try:
-        response = requests.post(
+    def post(payload):
+        return session.post(
             f"{base_url}/capture",
-            json={"exposure_ms": 20000},
-            timeout=5
+            json=payload,
+            timeout=(CONNECT_TIMEOUT, 5)
         )
-        if response.status_code == 400:
-            print(f"    ✓ Correctly rejected with 400")
-        else:
-            print(f"    ✗ Expected 400, got {response.status_code}")
-    except Exception as e:
-        print(f"    ✗ Error: {e}")
 
-    # Test missing parameter
-    print("  Testing missing exposure_ms...")
-    try:
-        response = requests.post(
-            f"{base_url}/capture",
-            json={},
-            timeout=5
-        )
-        if response.status_code == 400:
-            print(f"    ✓ Correctly rejected with 400")
-        else:
-            print(f"    ✗ Expected 400, got {response.status_code}")
-    except Exception as e:
-        print(f"    ✗ Error: {e}")
+    # The server rejects all of these before touching the camera, so send
+    # them concurrently and report the results in order
+    with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+        futures = [executor.submit(post, payload) for _, payload in cases]
+
+    for (label, _), future in zip(cases, futures):
+        print(f"  Testing {label}...")
+        try:
+            response = future.result()
+            if response.status_code == 400:
+                print(f"    ✓ Correctly rejected with 400")
+            else:
+                print(f"    ✗ Expected 400, got {response.status_code}")
+        except Exception as e:
+            print(f"    ✗ Error: {e}")
 
 
 def main():
@@ -282,9 +288,14 @@ Examples:
         '--output',
         help='Save captured image to file (e.g., capture.raw)'
     )
+    parser.add_argument(
+        '--no-gzip',
+        action='store_true',
+        help='Request the frame uncompressed (Accept-Encoding: identity)'
+    )
     parser.add_argument(
         '--test',
-        choices=['health', 'init', 'led_on', 'led_off', 'capture', 'shutdown'],
+        choices=[*PROBES, 'capture'],
         help='Run a specific test only'
     )
     parser.add_argument(
@@ -302,6 +313,22 @@ Examples:
 
     base_url = f"http://{args.host}:{args.port}"
 
+    # One keep-alive session for every call, so the test sequence reuses a
+    # single TCP connection to the Pi instead of reconnecting per request
+    session = requests.Session()
+    # Retry refused/dropped connections and gateway errors with backoff.
+    # urllib3 only replays idempotent methods on read/status errors, so a
+    # POST /capture is never re-sent once it reached the server.
+    retries = Retry(
+        total=2,
+        connect=1,
+        read=1,
+        backoff_factor=0.3,
+        status_forcelist=[502, 504],
+        raise_on_status=False
+    )
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+
     print("=" * 60)
     print("Western Blot Capture API Test Client")
     print("=" * 60)
@@ -310,18 +337,11 @@ Examples:
 
     # Run specific test if requested
     if args.test:
-        if args.test == 'health':
-            success = test_health(base_url)
-        elif args.test == 'init':
-            success = test_init(base_url)
-        elif args.test == 'led_on':
-            success = test_led_on(base_url)
-        elif args.test == 'led_off':
-            success = test_led_off(base_url)
-        elif args.test == 'capture':
-            success = test_capture(base_url, args.exposure, args.led, args.output)
-        elif args.test == 'shutdown':
-            success = test_shutdown(base_url)
+        if args.test == 'capture':
+            success = test_capture(session, base_url, args.exposure, args.led, args.output,
+                                   compress=not args.no_gzip)
+        else:
+            success = run_probe(session, base_url, args.test)
 
         print()
         print("=" * 60)
@@ -334,35 +354,40 @@ Examples:
 
     # Run full test sequence if requested
     if args.full_test:
+        # Resolve the host and open the pooled connection up front, so the
+        # timed sequence doesn't pay for the handshake on its first call
+        _warm_up(session, base_url)
+
         print("[1/6] Initializing device...")
-        if not test_init(base_url):
+        if not run_probe(session, base_url, 'init'):
             print("\n✗ Device initialization failed. Cannot continue.")
             sys.exit(1)
         print()
 
         print("[2/6] Checking health...")
-        test_health(base_url)
+        run_probe(session, base_url, 'health')
         print()
 
         print("[3/6] Testing LED on...")
-        test_led_on(base_url)
+        run_probe(session, base_url, 'led_on')
         print()
 
         print("[4/6] Capturing frame...")
-        test_capture(base_url, args.exposure, args.led, args.output or "test_frame.raw")
+        test_capture(session, base_url, args.exposure, args.led, args.output or "test_frame.raw",
+                     compress=not args.no_gzip)
         print()
 
         print("[5/6] Testing LED off...")
-        test_led_off(base_url)
+        run_probe(session, base_url, 'led_off')
         print()
 
         print("[6/6] Shutting down...")
-        test_shutdown(base_url)
+        run_probe(session, base_url, 'shutdown')
         print()
 
         if args.test_errors:
             print("[Extra] Testing error handling...")
-            test_invalid_exposure(base_url)
+            test_invalid_exposure(session, base_url)
             print()
 
         print("=" * 60)
@@ -371,7 +396,7 @@ Examples:
         return
 
     # Default: just test health and capture
-    if not test_health(base_url):
+    if not run_probe(session, base_url, 'health'):
         print("\n⚠ Health check shows device not ready.")
         print("  Run with --full-test to initialize the device first,")
         print("  or use --test init to initialize manually.")
@@ -380,11 +405,12 @@ Examples:
     print()
 
     # Test capture
-    success = test_capture(base_url, args.exposure, args.led, args.output)
+    success = test_capture(session, base_url, args.exposure, args.led, args.output,
+                           compress=not args.no_gzip)
 
     if args.test_errors:
         print()
-        test_invalid_exposure(base_url)
+        test_invalid_exposure(session, base_url)
 
     print()
     print("=" * 60)